@@ -13,16 +13,24 @@ import tkinter as tk
 from tkinter import simpledialog, messagebox
 import chess
 import chess.engine
+import chess.polyglot
 import os
+import queue
+import threading
+from collections import OrderedDict
 
 # --- CONFIG --- #
 STOCKFISH_PATH = r"path to stockfish"
 ENGINE_TIME = 0.25  # seconds to think for best-move (adjust to taste)
+EVAL_CACHE_SIZE = 4096  # positions whose best move/eval are remembered
+ENGINE_HASH = 512  # Stockfish transposition table size in MB
+ENGINE_THREADS = max(1, (os.cpu_count() or 2) - 1)  # default search threads; leave a core for the GUI
 
 # Unicode pieces
+# keyed by piece.symbol(): uppercase is white, lowercase is black
 UNICODE_PIECES = {
-    ('P', True): "♙", ('N', True): "♘", ('B', True): "♗", ('R', True): "♖", ('Q', True): "♕", ('K', True): "♔",
-    ('p', False): "♟", ('n', False): "♞", ('b', False): "♝", ('r', False): "♜", ('q', False): "♛", ('k', False): "♚",
+    'P': "♙", 'N': "♘", 'B': "♗", 'R': "♖", 'Q': "♕", 'K': "♔",
+    'p': "♟", 'n': "♞", 'b': "♝", 'r': "♜", 'q': "♛", 'k': "♚",
 }
 
 # Colors for board squares
@@ -30,6 +38,7 @@ LIGHT = "#EEEED2"
 DARK = "#769656"
 HIGHLIGHT = "#f6f669"
 MOVE_HIGHLIGHT = "#6fa8dc"
+SQUARE_SIZE = 64  # pixels per board square
 
 class ChessGUI:
     def __init__(self, master):
@@ -37,9 +46,23 @@ class ChessGUI:
         master.title("Cool Chess — Best Move Calculator")
         self.board = chess.Board()
         self.selected_square = None  # algebraic string e.g. 'e2'
-        self.square_buttons = {}
+        self._bg_items = {}   # square name -> canvas rectangle id
+        self._txt_items = {}  # square name -> canvas text id (piece glyph)
         self.engine = None
         self.best_move_info = None
+        self._move_info_shown = False  # labels show something other than "—"
+        self._result_q = queue.Queue()  # (kind, board, time, best, info, error) handed back from the search thread
+        # identifies the current game for the engine; python-chess sends ucinewgame only when it
+        # changes, so Stockfish keeps its hash and history tables between searches of one game
+        self._game = object()
+        # zobrist hash -> (search time, best move, info); asking again about a position that was
+        # already searched at least as long is answered without the engine
+        self._eval_cache = OrderedDict()
+        self._search_key = None  # zobrist hash of the position being searched; None when idle
+        self._zkey = chess.polyglot.zobrist_hash(self.board)  # kept in step with every board change
+        self._engine_threads = None  # Threads value the running engine was configured with
+        self._stop_event = threading.Event()  # set by the Stop button to end the running search
+        self._analysis = None  # handle of the running engine.analysis(), owned by the worker
 
         # Top controls frame
         ctrl = tk.Frame(master)
@@ -57,7 +80,19 @@ class ChessGUI:
         self.time_var = tk.DoubleVar(value=ENGINE_TIME)
         tk.Entry(ctrl, textvariable=self.time_var, width=5).grid(row=0, column=6, padx=4)
 
-        tk.Button(ctrl, text="Get Best Move", command=self.get_best_move).grid(row=0, column=7, padx=6)
+        tk.Label(ctrl, text="Threads:").grid(row=0, column=7, padx=(12,0))
+        self.thread_var = tk.IntVar(value=ENGINE_THREADS)
+        tk.Spinbox(ctrl, from_=1, to=os.cpu_count() or 1, textvariable=self.thread_var, width=3,
+                   command=self.apply_threads).grid(row=0, column=8, padx=4)
+
+        self.best_button = tk.Button(ctrl, text="Get Best Move", command=self.get_best_move)
+        self.best_button.grid(row=0, column=9, padx=6)
+        self.stop_button = tk.Button(ctrl, text="Stop", command=self.stop_search, state=tk.DISABLED)
+        self.stop_button.grid(row=0, column=10, padx=(0,6))
+
+        # keep one Stockfish process alive for the whole session so its hash/NNUE stay warm
+        self.open_engine()
+        master.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Info labels
         info = tk.Frame(master)
@@ -67,67 +102,97 @@ class ChessGUI:
         self.eval_label = tk.Label(info, text="Eval: —", font=("Helvetica", 11))
         self.eval_label.pack(side=tk.LEFT, padx=10)
 
-        # The board frame
+        # The board: one canvas with a rectangle and a text item per square, which is far
+        # cheaper to create and update than 64 Button widgets
         board_frame = tk.Frame(master)
         board_frame.pack(pady=8)
-
-        # 8x8 grid of buttons
-        for rank in range(8, 0, -1):
-            for file in range(1, 9):
-                sq = chess.square_name(chess.square(file - 1, rank - 1))
-                row = 8 - rank
-                col = file - 1
-                color = LIGHT if (row + col) % 2 == 0 else DARK
-                b = tk.Button(board_frame, text="", font=("Arial", 28), width=2, height=1,
-                              bg=color, activebackground=color,
-                              command=lambda s=sq: self.on_square_click(s))
-                b.grid(row=row, column=col)
-                self.square_buttons[sq] = b
+        self.canvas = tk.Canvas(board_frame, width=8 * SQUARE_SIZE, height=8 * SQUARE_SIZE,
+                                highlightthickness=0)
+        self.canvas.pack()
+
+        # square name <-> index tables so hot paths do a dict lookup instead of parsing 'e4',
+        # plus each square's board color, all computed once
+        self._sq_to_int = {s: chess.parse_square(s) for s in chess.SQUARE_NAMES}
+        self._int_to_sq = {v: k for k, v in self._sq_to_int.items()}
+        self._sq_base_color = {sq: (LIGHT if (chess.square_file(i) + chess.square_rank(i)) % 2 == 0 else DARK)
+                               for sq, i in self._sq_to_int.items()}
+
+        # 8x8 grid of squares; both items of a square carry its name as a tag
+        for sq, i in self._sq_to_int.items():
+            x = chess.square_file(i) * SQUARE_SIZE
+            y = (7 - chess.square_rank(i)) * SQUARE_SIZE
+            self._bg_items[sq] = self.canvas.create_rectangle(
+                x, y, x + SQUARE_SIZE, y + SQUARE_SIZE, fill=self._sq_base_color[sq], outline="", tags=(sq,))
+            self._txt_items[sq] = self.canvas.create_text(
+                x + SQUARE_SIZE // 2, y + SQUARE_SIZE // 2, text="", font=("Arial", 28), tags=(sq,))
+            self.canvas.tag_bind(sq, "<Button-1>", lambda e, s=sq: self.on_square_click(s))
+            # right-click places pieces (Windows: <Button-3>, Mac may differ)
+            self.canvas.tag_bind(sq, "<Button-3>", lambda e, s=sq: self.right_click_place(e, s))
 
         # bottom instructions
         tk.Label(master, text="Click a piece to select, click destination to move. Right-click a square to place a piece.",
                  font=("Helvetica", 9)).pack(pady=(6,0))
 
-        # bind right-click for placing pieces (Windows: <Button-3>, Mac may differ)
-        for sq, btn in self.square_buttons.items():
-            btn.bind("<Button-3>", lambda e, s=sq: self.right_click_place(e, s))
+        # what each square currently shows, so redraws only touch squares that changed
+        self._prev_piecemap = {}
+        self._last_bg = dict(self._sq_base_color)
+        self._prev_highlight_squares = set()
+        self._redraw_scheduled = False
+        self._pending_highlight = None
 
-        self.update_board_display()
+        self.request_redraw()
 
-    def update_board_display(self, highlight_move: chess.Move=None):
-        # Update the 64 squares with unicode piece characters
-        for sq, btn in self.square_buttons.items():
-            piece = self.board.piece_at(chess.parse_square(sq))
-            if piece:
-                glyph = UNICODE_PIECES[(piece.symbol(), piece.color == chess.WHITE)]
-                btn.config(text=glyph)
-            else:
-                btn.config(text="")
+    def request_redraw(self, highlight_move: chess.Move=None):
+        # Coalesce redraws: callbacks only mark the board dirty and a single
+        # update_board_display runs on the next idle cycle
+        self._pending_highlight = highlight_move
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.master.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self):
+        self._redraw_scheduled = False
+        self.update_board_display(self._pending_highlight)
 
-            # set background color depending on square
-            file = ord(sq[0]) - ord('a')
-            rank = int(sq[1]) - 1
-            color = LIGHT if (file + rank) % 2 == 0 else DARK
-            btn.config(bg=color, activebackground=color)
+    def update_board_display(self, highlight_move: chess.Move=None):
+        # Update the squares with unicode piece characters; each itemconfig is a round-trip
+        # into Tcl, so only squares whose piece changed since the last redraw are touched
+        piece_map = self.board.piece_map()  # occupied squares only, one call for the whole board
+        prev = self._prev_piecemap
+        for sq_i in prev.keys() - piece_map.keys():
+            self.canvas.itemconfig(self._txt_items[self._int_to_sq[sq_i]], text="")
+        for sq_i, piece in piece_map.items():
+            if prev.get(sq_i) != piece:
+                self.canvas.itemconfig(self._txt_items[self._int_to_sq[sq_i]], text=UNICODE_PIECES[piece.symbol()])
+        self._prev_piecemap = piece_map
 
         # update turn label
         self.turn_label.config(text=f"Side to move: {'White' if self.board.turn == chess.WHITE else 'Black'}")
 
-        # highlight selected
+        # squares that need a non-board color: selection, then best move on top
+        highlights = {}
         if self.selected_square:
-            self.square_buttons[self.selected_square].config(bg=HIGHLIGHT)
-
-        # highlight best move squares if provided
+            highlights[self.selected_square] = HIGHLIGHT
         if highlight_move:
-            from_sq = chess.square_name(highlight_move.from_square)
-            to_sq = chess.square_name(highlight_move.to_square)
-            self.square_buttons[from_sq].config(bg=MOVE_HIGHLIGHT)
-            self.square_buttons[to_sq].config(bg=MOVE_HIGHLIGHT)
+            highlights[self._int_to_sq[highlight_move.from_square]] = MOVE_HIGHLIGHT
+            highlights[self._int_to_sq[highlight_move.to_square]] = MOVE_HIGHLIGHT
+
+        # restore last call's highlights to the board color, then paint the new ones
+        for sq in self._prev_highlight_squares - highlights.keys():
+            self._set_square_bg(sq, self._sq_base_color[sq])
+        for sq, color in highlights.items():
+            self._set_square_bg(sq, color)
+        self._prev_highlight_squares = set(highlights)
+
+    def _set_square_bg(self, sq, color):
+        if self._last_bg[sq] != color:
+            self.canvas.itemconfig(self._bg_items[sq], fill=color)
+            self._last_bg[sq] = color
 
     def on_square_click(self, sq):
         # If no selection, pick up piece (if any)
         if not self.selected_square:
-            piece = self.board.piece_at(chess.parse_square(sq))
+            piece = self.board.piece_at(self._sq_to_int[sq])
             if piece:
                 self.selected_square = sq
             else:
@@ -135,39 +200,46 @@ class ChessGUI:
                 self.selected_square = None
         else:
             # try to move from selected_square -> sq
-            uci = self.selected_square + sq
-            move = None
-            # handle promotion if pawn moves to last rank
-            u = chess.Move.from_uci(uci)
-            if u in self.board.legal_moves:
-                move = u
-            else:
-                # try promotions (q,r,b,n)
-                for promo in ['q','r','b','n']:
-                    try_move = chess.Move.from_uci(uci + promo)
-                    if try_move in self.board.legal_moves:
-                        # if only one promotion legal, choose queen by default. If multiple, ask.
-                        if promo == 'q':
-                            move = try_move
-                            break
-                        else:
-                            move = try_move
-                            break
-            if move and move in self.board.legal_moves:
+            from_i = self._sq_to_int[self.selected_square]
+            to_i = self._sq_to_int[sq]
+            promotion = None
+            # only a pawn reaching the last rank can promote; test those with a queen
+            if self.board.piece_type_at(from_i) == chess.PAWN and chess.square_rank(to_i) in (0, 7):
+                promotion = chess.QUEEN
+            move = chess.Move(from_i, to_i, promotion=promotion)
+            if self.board.is_legal(move):
+                if promotion:
+                    # handle promotion: let the user pick the piece (any promotion is legal if the queen one is)
+                    move = chess.Move(from_i, to_i, promotion=self.promotion_dialog())
                 self.board.push(move)
+                self.rehash()
                 self.selected_square = None
-                self.best_move_info = None
-                self.best_move_label.config(text="Best move: —")
-                self.eval_label.config(text="Eval: —")
+                self._reset_move_info()
             else:
                 # invalid move: clear selection or reselect
-                piece = self.board.piece_at(chess.parse_square(sq))
+                piece = self.board.piece_at(self._sq_to_int[sq])
                 if piece:
                     self.selected_square = sq
                 else:
                     self.selected_square = None
 
-        self.update_board_display()
+        self.request_redraw()
+
+    def _reset_move_info(self):
+        # back to "—"; skips the label updates when they already show that
+        self.best_move_info = None
+        if not self._move_info_shown:
+            return
+        self.best_move_label.config(text="Best move: —")
+        self.eval_label.config(text="Eval: —")
+        self._move_info_shown = False
+
+    def promotion_dialog(self):
+        choice = simpledialog.askstring("Promotion", "Promote to q, r, b or n (cancel for queen):")
+        promo_map = {'q': chess.QUEEN, 'r': chess.ROOK, 'b': chess.BISHOP, 'n': chess.KNIGHT}
+        if not choice:
+            return chess.QUEEN
+        return promo_map.get(choice.strip().lower()[:1], chess.QUEEN)
 
     def right_click_place(self, event, sq):
         # Place a piece manually using a small dialog: choose color and piece type or remove
@@ -179,58 +251,84 @@ class ChessGUI:
         if not choice:
             return
         choice = choice.strip().lower()
+        sq_i = self._sq_to_int[sq]
+        old_piece = self.board.piece_at(sq_i)
         if choice == "remove":
-            self.board.remove_piece_at(chess.parse_square(sq))
+            self.board.remove_piece_at(sq_i)
+            self._edit_zkey(sq_i, old_piece, None)
         else:
             if len(choice) >= 2 and choice[0] in ('w','b') and choice[1] in ('p','n','b','r','q','k'):
                 color = chess.WHITE if choice[0] == 'w' else chess.BLACK
-                piece_map = {'p':'p','n':'n','b':'b','r':'r','q':'q','k':'k'}
-                sym = piece_map[choice[1]]
-                # python-chess uses uppercase for white, lowercase for black
-                symbol = sym.upper() if color == chess.WHITE else sym.lower()
-                piece = chess.Piece.from_symbol(symbol)
-                self.board.set_piece_at(chess.parse_square(sq), piece)
+                piece_map = {'p': chess.PAWN, 'n': chess.KNIGHT, 'b': chess.BISHOP,
+                             'r': chess.ROOK, 'q': chess.QUEEN, 'k': chess.KING}
+                piece = chess.Piece(piece_map[choice[1]], color)
+                self.board.set_piece_at(sq_i, piece)
+                self._edit_zkey(sq_i, old_piece, piece)
             else:
                 messagebox.showinfo("Input not valid", "Please enter like 'wq' (white queen) or 'bp' (black pawn) or 'remove'.")
                 return
 
-        self.best_move_info = None
-        self.best_move_label.config(text="Best move: —")
-        self.eval_label.config(text="Eval: —")
-        self.update_board_display()
+        self._reset_move_info()
+        self.request_redraw()
+
+    def rehash(self):
+        # full zobrist hash of the current board; used after moves and whole-board changes
+        self._zkey = chess.polyglot.zobrist_hash(self.board)
+
+    def _edit_zkey(self, square, old_piece, new_piece):
+        # A single piece edit only changes the piece-square part of the hash, so XOR the old
+        # piece out and the new one in. Castling and en passant keys also depend on which pieces
+        # are where, so fall back to a full hash when either is in play.
+        if self.board.castling_rights or self.board.ep_square is not None:
+            self.rehash()
+            return
+        keys = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+        for piece in (old_piece, new_piece):
+            if piece:
+                self._zkey ^= keys[64 * ((piece.piece_type - 1) * 2 + piece.color) + square]
+
+    def new_game(self):
+        # next search starts with ucinewgame (fresh hash/history in the engine)
+        self._game = object()
 
     def reset_board(self):
         self.board.reset()
+        self.rehash()
+        self.new_game()
         self.selected_square = None
-        self.best_move_info = None
-        self.best_move_label.config(text="Best move: —")
-        self.eval_label.config(text="Eval: —")
-        self.update_board_display()
+        self._reset_move_info()
+        self.request_redraw()
 
     def clear_pieces(self):
         self.board.clear()
+        self.rehash()
+        self.new_game()
         self.selected_square = None
-        self.best_move_info = None
-        self.best_move_label.config(text="Best move: —")
-        self.eval_label.config(text="Eval: —")
-        self.update_board_display()
+        self._reset_move_info()
+        self.request_redraw()
 
     def flip_side(self):
         # flip side to move without changing pieces by toggling board.turn
         self.board.turn = not self.board.turn
-        self.update_board_display()
+        if self.board.ep_square is None:
+            self._zkey ^= chess.polyglot.POLYGLOT_RANDOM_ARRAY[780]  # turn key
+        else:
+            self.rehash()
+        self.request_redraw()
 
     def load_fen_dialog(self):
         fen = simpledialog.askstring("Load FEN", "Paste a FEN string (or cancel):")
         if fen:
             try:
                 self.board.set_fen(fen)
-                self.update_board_display()
+                self.rehash()
+                self.new_game()
+                self.request_redraw()
             except Exception as e:
                 messagebox.showerror("Invalid FEN", f"Couldn't load FEN: {e}")
 
-    def get_best_move(self):
-        # Try to run Stockfish
+    def open_engine(self):
+        # Start Stockfish once; returns the error (or None) so callers can report it
         path = STOCKFISH_PATH
         if not os.path.isfile(path):
             # try path as-is (maybe in PATH)
@@ -238,68 +336,225 @@ class ChessGUI:
             pass
 
         try:
-            # open engine for this request
-            engine = chess.engine.SimpleEngine.popen_uci(path)
+            self.engine = chess.engine.SimpleEngine.popen_uci(path)
         except Exception as e:
-            messagebox.showerror("Engine not found",
-                                 f"Could not start Stockfish engine at '{path}'.\n\n"
-                                 "Download Stockfish and put the binary in the same folder as this script,\n"
-                                 "or set STOCKFISH_PATH to the full path.\n\nError: " + str(e))
-            return
+            self.engine = None
+            return e
 
-        # ask engine for best move and evaluation
-        t = float(self.time_var.get()) if self.time_var.get() > 0 else ENGINE_TIME
+        # only send options this engine build actually has
+        options = {"Hash": ENGINE_HASH, "UCI_ShowWDL": False}
         try:
-            # play to get best move
-            result = engine.play(self.board, chess.engine.Limit(time=t))
-            best = result.move
-            if best is None:
-                messagebox.showinfo("No legal move", "No legal move available (possible checkmate/stalemate).")
-                engine.quit()
-                return
-
-            # get evaluation info
-            try:
-                info = engine.analyse(self.board, chess.engine.Limit(time=t))
-                score = info.get("score")
-                # convert score to human friendly
-                if score is not None:
-                    if score.is_mate():
-                        val = f"Mate in {score.mate()}"
-                    else:
-                        # score is centipawns
-                        cp = score.white().score(mate_score=100000)
-                        val = f"{cp/100:.2f}"
-                else:
-                    val = "—"
-            except Exception:
-                val = "—"
+            self.engine.configure({k: v for k, v in options.items() if k in self.engine.options})
+        except chess.engine.EngineError:
+            # value out of range for this build: keep its defaults
+            pass
+        self._engine_threads = None
+        return self.apply_threads()
+
+    def apply_threads(self):
+        # Push the Threads spinbox to the engine. Reconfiguring would cut a running search
+        # short, so while one is in progress the change is picked up by the next search.
+        # Returns the error if the engine turned out to be dead (self.engine is then None).
+        if self.engine is None or self._search_key is not None:
+            return None
+        try:
+            threads = int(self.thread_var.get())
+        except (tk.TclError, ValueError):
+            return None
+        try:
+            if threads != self._engine_threads and "Threads" in self.engine.options:
+                self.engine.configure({"Threads": threads})
+                self._engine_threads = threads
+        except chess.engine.EngineTerminatedError as e:
+            # engine died while idle; drop it so the next search starts a fresh one
+            self.engine = None
+            return e
+        except chess.engine.EngineError:
+            pass
+        return None
 
-            # display
-            # SAN (human) and UCI
+    def _on_close(self):
+        if self.engine is not None:
             try:
-                san = self.board.san(best)
+                self.engine.quit()
             except Exception:
-                san = "—"
+                pass
+            self.engine = None
+        self.master.destroy()
 
-            self.best_move_label.config(text=f"Best move: {san}  ({best.uci()})")
-            self.eval_label.config(text=f"Eval: {val}")
-            self.best_move_info = best
+    def get_best_move(self):
+        t = float(self.time_var.get()) if self.time_var.get() > 0 else ENGINE_TIME
+        key = self._zkey
+        cached = self._eval_cache.get(key)
+        if cached is not None and cached[0] >= t:
+            self._eval_cache.move_to_end(key)
+            self.show_best_move(cached[1], cached[2])
+            return
 
-            # highlight the move on the board temporarily
-            self.update_board_display(highlight_move=best)
+        # sync Threads first: a dead engine is dropped there and restarted just below
+        self.apply_threads()
+
+        # (re)start Stockfish if it isn't running yet
+        if self.engine is None:
+            e = self.open_engine()
+            if e is not None:
+                messagebox.showerror("Engine not found",
+                                     f"Could not start Stockfish engine at '{STOCKFISH_PATH}'.\n\n"
+                                     "Download Stockfish and put the binary in the same folder as this script,\n"
+                                     "or set STOCKFISH_PATH to the full path.\n\nError: " + str(e))
+                return
 
-            # Ask user if they want to apply the move to the board
-            apply_it = messagebox.askyesno("Apply move?", f"Best move {san} ({best.uci()}).\n\nApply to board?")
-            if apply_it:
-                self.board.push(best)
-                self.update_board_display()
-        finally:
+        # ask engine for best move and evaluation on a worker thread so the Tk loop keeps running
+        self._search_key = key
+        self._stop_event.clear()
+        self.best_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        self.best_move_label.config(text="Best move: thinking…")
+        self._move_info_shown = True
+        threading.Thread(target=self._search_worker,
+                         args=(self.engine, self.board.copy(), t, self._game, self._stop_event),
+                         daemon=True).start()
+        self.master.after(50, self._poll_result)
+
+    def stop_search(self):
+        # end the running search early; the worker still reports the best move found so far
+        self._stop_event.set()
+        analysis = self._analysis
+        if analysis is not None:
             try:
-                engine.quit()
-            except Exception:
+                analysis.stop()
+            except chess.engine.EngineError:
+                # engine already gone; the worker reports that through the queue
                 pass
 
+    def _search_worker(self, engine, board, t, game, stop):
+        # runs off the Tk thread: only touches the engine, its own board copy and the queue
+        try:
+            # stream the search so the labels can show the current best line while it runs
+            with engine.analysis(board, chess.engine.Limit(time=t), game=game,
+                                 info=chess.engine.INFO_BASIC | chess.engine.INFO_SCORE | chess.engine.INFO_PV
+                                 ) as analysis:
+                self._analysis = analysis
+                if stop.is_set():
+                    analysis.stop()
+                for info in analysis:
+                    # python-chess leaves pv empty when it can't parse the first move
+                    if info.get("pv"):
+                        self._result_q.put(("partial", board, t, None, info, None))
+                best = analysis.wait().move
+                info = analysis.info
+            if stop.is_set():
+                # stopped early: only as good as the time it actually searched
+                t = info.get("time", 0)
+            # drop the handle before reporting "done": once that is queued the next search may
+            # start and install its own handle, which must not be cleared from here
+            self._analysis = None
+            self._result_q.put(("done", board, t, best, info, None))
+        except Exception as e:
+            self._analysis = None
+            self._result_q.put(("done", board, t, None, None, e))
+
+    def _poll_result(self):
+        # drain everything the worker sent since the last poll; only the newest partial matters
+        partial = None
+        result = None
+        while result is None:
+            try:
+                msg = self._result_q.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == "partial":
+                partial = msg
+            else:
+                result = msg
+
+        if result is None:
+            if partial is not None and partial[1] == self.board:
+                self.show_partial(partial[1], partial[4])
+            self.master.after(50, self._poll_result)
+            return
+
+        _, board, t, best, info, error = result
+        key, self._search_key = self._search_key, None
+        self.best_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self._reset_move_info()
+
+        if error is not None:
+            if isinstance(error, chess.engine.EngineTerminatedError):
+                # engine died mid-search; drop it so the next click starts a fresh one
+                self.engine = None
+            messagebox.showerror("Engine error", f"Stockfish stopped unexpectedly: {error}")
+            return
+
+        cached = self._eval_cache.get(key)
+        if best is not None and (cached is None or t >= cached[0]):
+            # never let a shorter (e.g. stopped) search replace a longer cached one
+            self._eval_cache[key] = (t, best, info)
+            self._eval_cache.move_to_end(key)
+            if len(self._eval_cache) > EVAL_CACHE_SIZE:
+                self._eval_cache.popitem(last=False)
+
+        if board != self.board:
+            # position was edited while the engine was thinking; the answer is stale
+            return
+
+        self.show_best_move(best, info)
+
+    def format_score(self, info):
+        score = info.get("score") if info else None
+        # convert score to human friendly
+        if score is None:
+            return "—"
+        if score.is_mate():
+            return f"Mate in {score.mate()}"
+        # score is centipawns
+        cp = score.white().score(mate_score=100000)
+        return f"{cp/100:.2f}"
+
+    def show_partial(self, board, info):
+        # intermediate result while the engine is still searching
+        move = info["pv"][0]
+        try:
+            san = board.san(move)
+        except Exception:
+            san = "—"
+        depth = info.get("depth")
+        suffix = f"  depth {depth}…" if depth else "  …"
+        self.best_move_label.config(text=f"Best move: {san}  ({move.uci()}){suffix}")
+        self.eval_label.config(text=f"Eval: {self.format_score(info)}")
+        self._move_info_shown = True
+
+    def show_best_move(self, best, info):
+        if best is None:
+            messagebox.showinfo("No legal move", "No legal move available (possible checkmate/stalemate).")
+            return
+
+        val = self.format_score(info)
+
+        # display
+        # SAN (human) and UCI
+        try:
+            san = self.board.san(best)
+        except Exception:
+            san = "—"
+
+        self.best_move_label.config(text=f"Best move: {san}  ({best.uci()})")
+        self.eval_label.config(text=f"Eval: {val}")
+        self.best_move_info = best
+        self._move_info_shown = True
+
+        # highlight the move on the board temporarily; paint it now, before the modal dialog
+        self.request_redraw(highlight_move=best)
+        self.master.update_idletasks()
+
+        # Ask user if they want to apply the move to the board
+        apply_it = messagebox.askyesno("Apply move?", f"Best move {san} ({best.uci()}).\n\nApply to board?")
+        if apply_it:
+            self.board.push(best)
+            self.rehash()
+            self.request_redraw()
+
 
 if __name__ == "__main__":
     root = tk.Tk()